@@ -12,7 +12,9 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from auth import require_auth, logout_button
-from db import ensure_schema, df
+from scheduler import reminders_sidebar
+from db import ensure_schema, df, ward_picker
+from queries import HOME_PATIENTS, HOME_SORTS
 from utils import dob_to_age
 
 # Page config + CSS
@@ -30,7 +32,9 @@ require_auth()
 
 # Sidebar (DB path hidden now)
 st.sidebar.title("🏥 ENT Handover")
+ward_picker()
 logout_button()
+reminders_sidebar()
 
 # Quick search specific to this page
 search_term = st.sidebar.text_input("🔎 Name / Hosp No / Reason", placeholder="e.g. Jane or H123...")
@@ -42,20 +46,12 @@ c1, c2, c3 = st.columns([2, 2, 1])
 with c1:
     term = st.text_input("Search", value=search_term or "", placeholder="Name, Hosp No, Reason...")
 with c2:
-    sort_by = st.radio("Sort by", ["Newest first","Patient name (A→Z)","Hospital number (A→Z)"], horizontal=True, index=0)
-    sort_sql = {"Newest first":"created_at DESC","Patient name (A→Z)":"patient_name ASC","Hospital number (A→Z)":"hospital_number ASC"}[sort_by]
+    sort_by = st.radio("Sort by", list(HOME_SORTS), horizontal=True, index=0)
+    sort_sql = HOME_SORTS[sort_by]
 with c3:
     limit = st.select_slider("Show", options=[20,50,100,500], value=20)
 
-data = df(f"""
-    SELECT p.id, p.patient_name, p.hospital_number, COALESCE(p.nhs_number,'') nhs_number,
-           p.date_of_birth, p.reason_for_admission, p.created_at,
-           (SELECT COUNT(*) FROM jobs j WHERE j.patient_id=p.id AND j.status!='Done') AS open_jobs
-    FROM patients p
-    WHERE (p.patient_name LIKE ? OR p.hospital_number LIKE ? OR p.reason_for_admission LIKE ?)
-    ORDER BY {sort_sql}
-    LIMIT ?
-""", (f"%{term}%", f"%{term}%", f"%{term}%", limit))
+data = df(HOME_PATIENTS.format(sort_sql=sort_sql), (f"%{term}%", f"%{term}%", f"%{term}%", limit))
 
 if not data.empty:
     data["Age"] = data["date_of_birth"].apply(dob_to_age)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check.
+
+Seeds a throwaway database, runs EXPLAIN QUERY PLAN on every read query the
+pages issue (queries.py, each Home sort order and Admin table included) and
+fails if a plan contains a table scan, in rowid or index order, or a temp
+B-tree, unless ALLOWED lists that step for the query with a reason. Run it
+after touching queries.py or the schema indexes; it exits non-zero on any
+regression.
+
+Run: python check_query_plans.py [--patients 2000]
+"""
+
+import argparse
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import queries  # noqa: E402
+
+# Plan steps (matched by prefix) that are expected for a query, with the reason.
+ALLOWED = {
+    "HOME_PATIENTS": {"SCAN p USING INDEX": "LIKE '%term%' can't seek an index; the scan follows the sort index and stops at LIMIT"},
+    "PATIENT_PICKER": {"SCAN patients USING INDEX": "the picker lists every patient, newest first"},
+    "JOBS_BOARD": {"SCAN j": "the board loads every job and filters in the page"},
+    "ADMIN_COUNT": {"SCAN ": "counts every row of the table"},
+    "ADMIN_EXPORT": {"SCAN ": "CSV export of the whole table"},
+    "CHANGES_SUMMARY": {
+        "USE TEMP B-TREE FOR GROUP BY": "groups only the events in the ts range",
+        "USE TEMP B-TREE FOR ORDER BY": "sorts the per-patient aggregate, one row per changed patient",
+    },
+}
+
+# Any SCAN reads every row, whether in rowid or index order. FTS5 lookups show
+# up as "SCAN <t> VIRTUAL TABLE INDEX ..." but use the full-text index.
+FULL_SCAN = re.compile(r"^SCAN (?!.*VIRTUAL TABLE)")
+
+
+def page_queries():
+    """(name, sql, params) for every read query the pages issue."""
+    yield from (
+        (f"HOME_PATIENTS[{label}]", queries.HOME_PATIENTS.format(sort_sql=sort_sql), ("%a%", "%a%", "%a%", 20))
+        for label, sort_sql in queries.HOME_SORTS.items()
+    )
+    yield "PATIENT_PICKER", queries.PATIENT_PICKER, ()
+    yield "PATIENT_BY_ID", queries.PATIENT_BY_ID, (1,)
+    yield "PATIENT_NOTES", queries.PATIENT_NOTES, (1,)
+    yield "PATIENT_JOBS", queries.PATIENT_JOBS, (1,)
+    yield "JOBS_BOARD", queries.JOBS_BOARD, ()
+    yield "CHANGES_SUMMARY", queries.CHANGES_SUMMARY, ("2025-01-01 00:00:00",)
+    yield "CHANGES_EVENTS", queries.CHANGES_EVENTS, ("2025-01-01 00:00:00",)
+    yield "SCHEDULER_OPEN_JOBS", queries.SCHEDULER_OPEN_JOBS, ()
+    yield "DUP_BY_NAME", queries.DUP_BY_NAME, ('"jan" OR "ane" OR "doe"', 50)
+    yield "DUP_BY_DOB", queries.DUP_BY_DOB, ("1985-04-12", 200)
+    yield "DUP_BY_HOSP", queries.DUP_BY_HOSP, ("H1000001",)
+    yield "DUP_BY_NHS", queries.DUP_BY_NHS, ("9991234567",)
+    yield "DUP_CANDIDATES", queries.DUP_CANDIDATES.format(placeholders="?,?,?"), (1, 2, 3)
+    for table in queries.ADMIN_TABLES:
+        yield f"ADMIN_COUNT[{table}]", queries.ADMIN_COUNT.format(table=table), ()
+        yield f"ADMIN_EXPORT[{table}]", queries.ADMIN_EXPORT.format(table=table), ()
+
+
+def problems(name: str, plan: list[str]) -> list[str]:
+    allowed = ALLOWED.get(name.split("[")[0], {})
+    found = []
+    for detail in plan:
+        if any(detail.startswith(prefix) for prefix in allowed):
+            continue
+        if FULL_SCAN.match(detail) or detail.startswith("USE TEMP B-TREE"):
+            found.append(detail)
+    return found
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--patients", type=int, default=2000, help="seeded patients (default: 2000)")
+    args = ap.parse_args()
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ent_plans_"))
+    db_path = tmp_dir / "plans.db"
+    os.environ["ENT_DB_PATH"] = str(db_path)
+    os.environ["ENT_WARDS"] = "ENT"  # the ward whose file is DB_PATH
+
+    from load_test import _quiet_streamlit, seed_database
+
+    _quiet_streamlit()
+    failed = 0
+    try:
+        seed_database(db_path, args.patients, 4, 6, random.Random(1))
+        from db import q  # after ENT_DB_PATH, so the shared connection opens the seeded file
+
+        for name, sql, params in page_queries():
+            plan = [row[3] for row in q("EXPLAIN QUERY PLAN " + sql, params)]
+            bad = problems(name, plan)
+            failed += bool(bad)
+            print(f"{'FAIL' if bad else 'ok  '}  {name}")
+            for detail in plan:
+                print(f"        {'!! ' if detail in bad else ''}{detail}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\n{failed} query plan(s) with full scans or temp B-trees." if failed else "\nAll query plans OK.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
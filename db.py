@@ -2,6 +2,7 @@ import os
 import sqlite3
 from pathlib import Path
 from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import streamlit as st
 
@@ -15,6 +16,48 @@ DB_PATH = Path(
 )
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# One database file (and so one WAL writer) per ward, named from the ward's slug
+# so reordering ENT_WARDS never swaps data: ENT keeps the original DB_PATH, the
+# others sit next to it, e.g. ent_handover_general_surgery.db.
+WARDS = [w.strip() for w in os.environ.get("ENT_WARDS", "ENT").split(",") if w.strip()] or ["ENT"]
+
+def _ward_slug(ward: str) -> str:
+    return "".join(ch if ch.isalnum() else "_" for ch in ward.lower()).strip("_")
+
+def _check_wards(wards: list[str]):
+    """Each ward must map to its own file: refuse empty or colliding slugs."""
+    seen = {}
+    for ward in wards:
+        slug = _ward_slug(ward)
+        if not slug:
+            raise ValueError(f"ENT_WARDS: ward name {ward!r} has no letters or digits to name its database file")
+        if slug in seen:
+            raise ValueError(f"ENT_WARDS: wards {seen[slug]!r} and {ward!r} would share the database file for {slug!r}")
+        seen[slug] = ward
+
+_check_wards(WARDS)
+
+LEGACY_WARD_SLUG = "ent"  # the ward whose data is in DB_PATH itself
+
+def ward_db_path(ward: str) -> Path:
+    if _ward_slug(ward) == LEGACY_WARD_SLUG:
+        return DB_PATH
+    return DB_PATH.with_name(f"{DB_PATH.stem}_{_ward_slug(ward)}{DB_PATH.suffix}")
+
+def current_ward() -> str:
+    ward = st.session_state.get("ward")
+    return ward if ward in WARDS else WARDS[0]
+
+def _switch_ward():
+    st.session_state.ward = st.session_state.ward_picker
+    st.session_state.pop("selected_patient_id", None)  # ids are per ward database
+    st.session_state.pop("reminder_no", None)  # each ward's scheduler numbers its own reminders
+
+def ward_picker():
+    """Sidebar ward selector (hidden when only one ward is configured)."""
+    if len(WARDS) > 1:
+        st.sidebar.selectbox("Ward", WARDS, index=WARDS.index(current_ward()), key="ward_picker", on_change=_switch_ward)
+
 @st.cache_resource(show_spinner=False)
 def get_conn(db_path_str: str):
     conn = sqlite3.connect(db_path_str, check_same_thread=False)
@@ -22,24 +65,55 @@ def get_conn(db_path_str: str):
     conn.execute("PRAGMA journal_mode = WAL;")
     return conn
 
-def conn():
-    return get_conn(DB_PATH.as_posix())
+def conn(ward: str | None = None):
+    return get_conn(ward_db_path(ward or current_ward()).as_posix())
 
-def q(sql: str, params: tuple = ()):
-    with closing(conn().cursor()) as cur:
+def q(sql: str, params: tuple = (), ward: str | None = None):
+    with closing(conn(ward).cursor()) as cur:
         cur.execute(sql, params)
         return cur.fetchall()
 
-def exec1(sql: str, params: tuple = ()):
-    with closing(conn().cursor()) as cur:
+def exec1(sql: str, params: tuple = (), events: tuple = (), ward: str | None = None):
+    """Run one write and commit. `events` are (kind, patient_id, ref_id, detail)
+    rows appended to the event log in the same commit; a None patient_id/ref_id
+    is filled with the new row's id (for inserts). `ward` defaults to the
+    sidebar selection."""
+    with closing(conn(ward).cursor()) as cur:
         cur.execute(sql, params)
-        conn().commit()
-        return cur.lastrowid
+        rowid = cur.lastrowid
+        for kind, patient_id, ref_id, detail in events:
+            cur.execute(
+                "INSERT INTO events (kind, patient_id, ref_id, detail) VALUES (?,?,?,?)",
+                (kind, rowid if patient_id is None else patient_id, rowid if ref_id is None else ref_id, detail),
+            )
+        conn(ward).commit()
+        return rowid
 
-def df(sql: str, params: tuple = ()):
-    return pd.read_sql_query(sql, conn(), params=params)
+def df(sql: str, params: tuple = (), ward: str | None = None):
+    return pd.read_sql_query(sql, conn(ward), params=params)
 
-def ensure_schema():
+def df_all_wards(sql: str, params: tuple = ()):
+    """Run one query on every ward's database in parallel and stack the results
+    with a leading `ward` column. Rows keep their per-ward ids."""
+    with ThreadPoolExecutor(max_workers=len(WARDS)) as pool:
+        parts = list(pool.map(lambda w: df(sql, params, ward=w), WARDS))
+    for ward, part in zip(WARDS, parts):
+        part.insert(0, "ward", ward)
+    return pd.concat(parts, ignore_index=True)
+
+PRIORITY_RANK = {"Urgent": 0, "Soon": 1, "Routine": 2}
+
+def job_change_events(patient_id: int, job_id: int, old_status: str, new_status: str, old_prio: str, new_prio: str):
+    """Event rows for a job edit: completion, other status moves, priority raised."""
+    events = []
+    if new_status != old_status:
+        kind = "job_completed" if new_status == "Done" else "job_status"
+        events.append((kind, patient_id, job_id, f"{old_status} → {new_status}"))
+    if PRIORITY_RANK.get(new_prio, 2) < PRIORITY_RANK.get(old_prio, 2):
+        events.append(("job_escalated", patient_id, job_id, f"{old_prio} → {new_prio}"))
+    return tuple(events)
+
+def ensure_schema(ward: str | None = None):
     schema = r"""
     PRAGMA foreign_keys = ON;
     CREATE TABLE IF NOT EXISTS patients (
@@ -72,10 +146,67 @@ def ensure_schema():
         created_at TEXT NOT NULL DEFAULT (datetime('now')),
         updated_at TEXT NOT NULL DEFAULT (datetime('now'))
     );
+    -- Append-only log of patient/note/job changes, for "what changed since" views
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY,
+        ts TEXT NOT NULL DEFAULT (datetime('now')),
+        kind TEXT NOT NULL,
+        patient_id INTEGER NOT NULL,
+        ref_id INTEGER,
+        detail TEXT
+    );
     CREATE INDEX IF NOT EXISTS idx_patients_name ON patients(patient_name);
     CREATE INDEX IF NOT EXISTS idx_progress_patient_time ON progress_notes(patient_id, note_time DESC);
     CREATE INDEX IF NOT EXISTS idx_jobs_patient_status ON jobs(patient_id, status);
     CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs(due_time);
+    CREATE INDEX IF NOT EXISTS idx_patients_created ON patients(created_at);
+    -- Patient Details job order; expression must match queries.PATIENT_JOBS
+    CREATE INDEX IF NOT EXISTS idx_jobs_patient_priority ON jobs(patient_id, (CASE priority WHEN 'Urgent' THEN 0 WHEN 'Soon' THEN 1 ELSE 2 END), created_at);
+    -- Open jobs only, for the due-job scheduler
+    CREATE INDEX IF NOT EXISTS idx_jobs_open_due ON jobs(due_time) WHERE status != 'Done';
+    CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+    -- Duplicate-patient check: trigram name index + normalised identifiers
+    CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+        patient_name, content='patients', content_rowid='id', tokenize='trigram'
+    );
+    CREATE TRIGGER IF NOT EXISTS trg_patients_fts_ins AFTER INSERT ON patients BEGIN
+        INSERT INTO patients_fts(rowid, patient_name) VALUES (new.id, new.patient_name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_patients_fts_del AFTER DELETE ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, patient_name) VALUES ('delete', old.id, old.patient_name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_patients_fts_upd AFTER UPDATE OF patient_name ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, patient_name) VALUES ('delete', old.id, old.patient_name);
+        INSERT INTO patients_fts(rowid, patient_name) VALUES (new.id, new.patient_name);
+    END;
+    CREATE INDEX IF NOT EXISTS idx_patients_hosp_norm ON patients(replace(upper(hospital_number),' ',''));
+    CREATE INDEX IF NOT EXISTS idx_patients_nhs_norm ON patients(replace(nhs_number,' ',''));
+    CREATE INDEX IF NOT EXISTS idx_patients_dob ON patients(date_of_birth);
+    """
+    # Every page runs this, so the script above must stay CREATE ... IF NOT EXISTS
+    # only (no writer lock once the schema exists). The event-log backfill is a
+    # write, so it runs just once, when the events table is first created.
+    backfill = r"""
+    INSERT INTO events (ts, kind, patient_id, ref_id, detail)
+    SELECT created_at, 'admission', id, id, reason_for_admission FROM patients
+    UNION ALL SELECT created_at, 'note', patient_id, id, NULL FROM progress_notes
+    UNION ALL SELECT created_at, 'job_added', patient_id, id, job_text FROM jobs
+    UNION ALL SELECT updated_at, 'job_completed', patient_id, id, job_text FROM jobs WHERE status='Done'
     """
-    conn().executescript(schema)
-    conn().commit()
+    events_missing = not q("SELECT 1 FROM sqlite_master WHERE name='events'", ward=ward)
+    conn(ward).executescript(schema)
+    if events_missing:
+        conn(ward).execute(backfill)
+    conn(ward).commit()
+    _sync_fts(ward_db_path(ward or current_ward()).as_posix())
+
+@st.cache_resource(show_spinner=False)
+def _sync_fts(db_path_str: str) -> bool:
+    """Once per process and file: rebuild the trigram index if it doesn't cover
+    every patient (e.g. the table was created empty over existing rows)."""
+    c = get_conn(db_path_str)
+    indexed = c.execute("SELECT COUNT(*) FROM patients_fts_docsize").fetchone()[0]
+    if indexed != c.execute("SELECT COUNT(*) FROM patients").fetchone()[0]:
+        c.execute("INSERT INTO patients_fts(patients_fts) VALUES ('rebuild')")
+        c.commit()
+    return True
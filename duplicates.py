@@ -0,0 +1,122 @@
+import re
+import unicodedata
+from contextlib import closing
+from difflib import SequenceMatcher
+import pandas as pd
+
+from db import conn, df, q
+from queries import DUP_BY_NAME, DUP_BY_DOB, DUP_BY_HOSP, DUP_BY_NHS, DUP_CANDIDATES
+from scheduler import scheduler
+
+NAME_CANDIDATES = 50   # top trigram hits rescored per check
+DOB_CANDIDATES = 200   # same-DOB records rescored per check
+MIN_DOB_NAME = 0.5     # name similarity needed before a shared DOB counts
+MIN_SCORE = 0.5        # below this a candidate isn't shown
+
+def _words(s: str) -> str:
+    """Letters (any script) only, single-spaced."""
+    return " ".join(re.sub(r"[\W\d_]+", " ", s).split())
+
+def normalise_name(name: str) -> str:
+    """Casefolded, accents removed: 'Núñez' -> 'nunez'. Non-Latin letters are kept."""
+    s = unicodedata.normalize("NFKD", (name or "").casefold())
+    return _words("".join(ch for ch in s if not unicodedata.combining(ch)))
+
+def normalise_id(s: str | None) -> str:
+    return (s or "").replace(" ", "").upper()
+
+def name_similarity(a: str, b: str) -> float:
+    """0..1, tolerant of typos and of first/last name order."""
+    a, b = normalise_name(a), normalise_name(b)
+    if not a or not b:
+        return 0.0
+    direct = SequenceMatcher(None, a, b).ratio()
+    by_token = SequenceMatcher(None, " ".join(sorted(a.split())), " ".join(sorted(b.split()))).ratio()
+    return max(direct, by_token)
+
+def _trigram_query(name: str) -> str | None:
+    """FTS5 MATCH string OR-ing the name's trigrams, so near-misses still hit.
+
+    The index holds names as typed, so trigrams are taken both with and
+    without accents."""
+    forms = {normalise_name(name), _words(unicodedata.normalize("NFC", (name or "").casefold()))}
+    grams = sorted({n[i:i + 3] for n in forms for i in range(len(n) - 2)})
+    return " OR ".join('"' + g + '"' for g in grams) or None
+
+def find_duplicates(name: str, dob: str | None = None, nhs: str | None = None, hosp: str | None = None,
+                    exclude_id: int | None = None, limit: int = 5, ward: str | None = None) -> pd.DataFrame:
+    """Likely existing records for a patient, best first.
+
+    Candidates come from indexes only: the trigram name index (top NAME_CANDIDATES
+    by bm25), records with the same DOB (equal-ranked trigram hits for a common
+    name are cut arbitrarily, so the DOB match must be looked up separately) and
+    exact matches on the normalised hospital and NHS numbers. Each is then scored
+    on name similarity, DOB and identifiers.
+    """
+    ids = set()
+    match = _trigram_query(name)
+    if match:
+        ids.update(r[0] for r in q(DUP_BY_NAME, (match, NAME_CANDIDATES), ward=ward))
+    if dob:
+        ids.update(r[0] for r in q(DUP_BY_DOB, (dob, DOB_CANDIDATES), ward=ward))
+    if normalise_id(hosp):
+        ids.update(r[0] for r in q(DUP_BY_HOSP, (normalise_id(hosp),), ward=ward))
+    if normalise_id(nhs):
+        ids.update(r[0] for r in q(DUP_BY_NHS, (normalise_id(nhs),), ward=ward))
+    ids.discard(exclude_id)
+
+    cols = ["id", "patient_name", "hospital_number", "nhs_number", "date_of_birth", "reason_for_admission", "score", "why"]
+    if not ids:
+        return pd.DataFrame(columns=cols)
+
+    cands = df(DUP_CANDIDATES.format(placeholders=",".join("?" * len(ids))), tuple(ids), ward=ward)
+    scores, whys = [], []
+    for r in cands.itertuples():
+        sim = name_similarity(name, r.patient_name)
+        score, why = 0.6 * sim, [f"name {sim:.0%}"]
+        if dob and r.date_of_birth == dob and sim >= MIN_DOB_NAME:
+            score += 0.3; why.append("same DOB")
+        if normalise_id(hosp) and normalise_id(r.hospital_number) == normalise_id(hosp):
+            score += 0.5; why.append("same hospital no")
+        if normalise_id(nhs) and normalise_id(r.nhs_number) == normalise_id(nhs):
+            score += 0.5; why.append("same NHS no")
+        scores.append(min(score, 1.0)); whys.append(", ".join(why))
+    cands["score"] = scores
+    cands["why"] = whys
+    cands = cands[cands["score"] >= MIN_SCORE].sort_values("score", ascending=False)
+    return cands.head(limit)[cols].reset_index(drop=True)
+
+def merge_patients(keep_id: int, drop_id: int, ward: str | None = None):
+    """Fold `drop_id` into `keep_id`: move notes and jobs, fill blank fields on the
+    kept record from the dropped one, delete the dropped record and log a merge
+    event. One transaction; moved jobs are then relabelled in the reminder queue."""
+    c = conn(ward)
+    with closing(c.cursor()) as cur:
+        try:
+            dropped = cur.execute("SELECT patient_name, hospital_number FROM patients WHERE id=?", (drop_id,)).fetchone()
+            kept = cur.execute("SELECT patient_name FROM patients WHERE id=?", (keep_id,)).fetchone()
+            if dropped is None or kept is None or keep_id == drop_id:
+                raise ValueError("Pick two different existing patients.")
+            moved = cur.execute("SELECT id, due_time, status, job_text FROM jobs WHERE patient_id=?", (drop_id,)).fetchall()
+            cur.execute("UPDATE progress_notes SET patient_id=? WHERE patient_id=?", (keep_id, drop_id))
+            cur.execute("UPDATE jobs SET patient_id=? WHERE patient_id=?", (keep_id, drop_id))
+            cur.execute("""
+                UPDATE patients SET
+                    nhs_number = COALESCE(NULLIF(patients.nhs_number,''), d.nhs_number),
+                    pmh = COALESCE(NULLIF(patients.pmh,''), d.pmh),
+                    psh = COALESCE(NULLIF(patients.psh,''), d.psh),
+                    dh = COALESCE(NULLIF(patients.dh,''), d.dh),
+                    allergies = COALESCE(NULLIF(patients.allergies,''), d.allergies),
+                    updated_at = datetime('now')
+                FROM (SELECT * FROM patients WHERE id=?) AS d
+                WHERE patients.id=?
+            """, (drop_id, keep_id))
+            cur.execute("DELETE FROM patients WHERE id=?", (drop_id,))
+            cur.execute("INSERT INTO events (kind, patient_id, ref_id, detail) VALUES ('merge',?,?,?)",
+                        (keep_id, drop_id, f"Merged {dropped[0]} • {dropped[1]} (ID {drop_id})"))
+            c.commit()
+        except Exception:
+            c.rollback()
+            raise
+    for job_id, due_time, status, job_text in moved:
+        scheduler(ward).upsert(job_id, due_time, status, f"{job_text} — {kept[0]}")
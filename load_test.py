@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Concurrent multi-session load test for the ENT handover app.
+
+Headless driver: each simulated clinician is a thread issuing the same
+statements as the pages, through the same db helpers, so all sessions share the
+single cached connection from db.get_conn exactly as they do on a live server
+(Streamlit runs every session's script on its own thread). Like the pages,
+every scenario starts with db.ensure_schema().
+Latencies are database time only: Streamlit's script execution and rendering
+cost is not included. AppTest is not used because it swaps a process-global
+Runtime on every run and cannot drive sessions concurrently.
+
+Each user loops over a weighted mix of scenarios:
+
+- home_search      Home page search (random term, sort and limit)
+- patient_details  Patient Details opened for a random patient
+- add_note         Patient Details + insert a progress note
+- job_status_flip  Jobs Board load + set a job to "In Progress" / "Done"
+
+--processes N splits the users across N processes, each with its own shared
+connection, to see how several server replicas contend for the WAL writer lock.
+
+For every user count it reports per scenario: runs, lock errors, other errors,
+p50/p95/p99 latency and throughput.
+
+The test runs against a throwaway seeded database (never ent_handover.db).
+
+Run: python load_test.py --users 1,5,10,20 --duration 30 [--processes 4]
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from queries import HOME_PATIENTS, HOME_SORTS, JOBS_BOARD, PATIENT_BY_ID, PATIENT_JOBS, PATIENT_NOTES, PATIENT_PICKER  # noqa: E402
+
+SCENARIO_WEIGHTS = {
+    "home_search": 50,
+    "patient_details": 25,
+    "add_note": 15,
+    "job_status_flip": 10,
+}
+
+SEARCH_TERMS = ["Jane", "Smith", "H10", "abscess", "tonsil", "epistaxis", "a", ""]
+FIRST_NAMES = ["Jane", "John", "Amira", "Omar", "Chloe", "Liam", "Sara", "Yusuf", "Emma", "Noah"]
+LAST_NAMES = ["Doe", "Smith", "Khan", "Jones", "Patel", "Brown", "Ali", "Taylor", "Evans", "Wilson"]
+REASONS = ["Peritonsillar abscess", "Tonsillitis", "Epistaxis", "Neck abscess", "Post-tonsillectomy bleed", "Stridor"]
+LOCK_MARKERS = ("database is locked", "database table is locked")
+
+
+# ---------------- Database setup ----------------
+def seed_database(db_path: Path, patients: int, jobs_per_patient: int, notes_per_patient: int, rng: random.Random):
+    """Create a fresh database with the app schema and synthetic ward data."""
+    import db  # imported after ENT_DB_PATH is set
+
+    db.ensure_schema()
+    c = sqlite3.connect(db_path)
+    with c:
+        c.executemany(
+            """INSERT INTO patients (patient_name, hospital_number, nhs_number, date_of_birth, reason_for_admission, allergies)
+               VALUES (?,?,?,?,?,?)""",
+            [
+                (
+                    f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    f"H{1000000 + i}",
+                    f"{rng.randint(100, 999)} {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+                    f"{rng.randint(1930, 2015)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                    rng.choice(REASONS),
+                    "NKDA",
+                )
+                for i in range(patients)
+            ],
+        )
+        ids = [r[0] for r in c.execute("SELECT id FROM patients")]
+        c.executemany(
+            "INSERT INTO progress_notes (patient_id, note, author) VALUES (?,?,?)",
+            [(pid, "Seeded progress note.", "Load test") for pid in ids for _ in range(notes_per_patient)],
+        )
+        c.executemany(
+            "INSERT INTO jobs (patient_id, job_text, priority, status, due_time, assigned_to) VALUES (?,?,?,?,?,?)",
+            [
+                (
+                    pid,
+                    "Seeded job",
+                    rng.choice(["Urgent", "Soon", "Routine"]),
+                    rng.choice(["Open", "Open", "In Progress", "Done"]),
+                    f"2025-01-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00",
+                    "Ward SHO",
+                )
+                for pid in ids for _ in range(jobs_per_patient)
+            ],
+        )
+    c.close()
+    return ids
+
+
+# ---------------- Scenarios ----------------
+# Each scenario issues the same statements, through the same db helpers, as the
+# page it stands in for, starting with the ensure_schema() every page runs first.
+def home_search(rng, patient_ids):
+    from db import df, ensure_schema
+
+    ensure_schema()
+    term = rng.choice(SEARCH_TERMS)
+    sort_sql = rng.choice(list(HOME_SORTS.values()))
+    df(HOME_PATIENTS.format(sort_sql=sort_sql), (f"%{term}%", f"%{term}%", f"%{term}%", rng.choice([20, 50, 100])))
+
+
+def patient_details(rng, patient_ids):
+    from db import df, ensure_schema, q
+
+    ensure_schema()
+    pid = rng.choice(patient_ids)
+    df(PATIENT_PICKER)
+    q(PATIENT_BY_ID, (pid,))
+    df(PATIENT_NOTES, (pid,))
+    df(PATIENT_JOBS, (pid,))
+    return pid
+
+
+def add_note(rng, patient_ids):
+    from db import exec1
+
+    pid = patient_details(rng, patient_ids)
+    exec1("INSERT INTO progress_notes (patient_id,note,author) VALUES (?,?,?)",
+          (pid, f"Load test note {rng.random():.6f}", "Load test"),
+          events=(("note", pid, None, "Load test"),))
+
+
+def job_status_flip(rng, patient_ids):
+    from db import df, ensure_schema, exec1, job_change_events
+
+    ensure_schema()
+    jobs = df(JOBS_BOARD)
+    if jobs.empty:
+        return
+    row = jobs.iloc[rng.randrange(len(jobs))]
+    new_status = rng.choice(["In Progress", "Done"])
+    exec1("UPDATE jobs SET status=?, updated_at=datetime('now') WHERE id=?", (new_status, int(row.id)),
+          events=job_change_events(int(row.patient_id), int(row.id), row.status, new_status, row.priority, row.priority))
+
+
+SCENARIOS = {
+    "home_search": home_search,
+    "patient_details": patient_details,
+    "add_note": add_note,
+    "job_status_flip": job_status_flip,
+}
+
+
+# ---------------- Runner ----------------
+def _quiet_streamlit():
+    """db uses st.cache_resource outside a script run; silence the bare-mode warnings."""
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")
+
+
+def _classify(error: BaseException | None) -> str:
+    if error is None:
+        return "ok"
+    if any(m in str(error) for m in LOCK_MARKERS):
+        return "lock"
+    return "error"
+
+
+def user_loop(user_no: int, deadline: float, patient_ids, results, lock, seed: int, think_time: float):
+    rng = random.Random(seed * 1000 + user_no)
+    names = list(SCENARIO_WEIGHTS)
+    weights = list(SCENARIO_WEIGHTS.values())
+    while time.time() < deadline:
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        error = None
+        try:
+            SCENARIOS[name](rng, patient_ids)
+        except Exception as e:
+            error = e
+        elapsed = time.perf_counter() - start
+        detail = f"{type(error).__name__}: {error}" if error is not None else ""
+        with lock:
+            results[name].append((elapsed, _classify(error), detail))
+        if think_time:
+            time.sleep(rng.uniform(0, think_time))
+
+
+def run_threads(first_user: int, users: int, deadline: float, patient_ids, seed: int, think_time: float):
+    """Run `users` sessions as threads of this process, sharing its cached connection."""
+    results = defaultdict(list)
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=user_loop, args=(first_user + i, deadline, patient_ids, results, lock, seed, think_time), daemon=True)
+        for i in range(users)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return dict(results)
+
+
+def _process_worker(first_user: int, users: int, deadline: float, patient_ids, seed: int, think_time: float):
+    _quiet_streamlit()
+    return run_threads(first_user, users, deadline, patient_ids, seed, think_time)
+
+
+def run_level(users: int, processes: int, duration: float, patient_ids, seed: int, think_time: float):
+    """One load level. With processes > 1, users are split across that many
+    server-like processes, each with its own shared connection (and so its own
+    WAL writer competing for the database lock)."""
+    started = time.perf_counter()
+    deadline = time.time() + duration
+    if processes <= 1:
+        return run_threads(0, users, deadline, patient_ids, seed, think_time), time.perf_counter() - started
+
+    split = [users // processes + (1 if i < users % processes else 0) for i in range(processes)]
+    firsts = [sum(split[:i]) for i in range(processes)]
+    results = defaultdict(list)
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes) as pool:
+        parts = pool.starmap(
+            _process_worker,
+            [(f, n, deadline, patient_ids, seed, think_time) for f, n in zip(firsts, split) if n],
+        )
+    for part in parts:
+        for name, rows in part.items():
+            results[name] += rows
+    return dict(results), time.perf_counter() - started
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def print_report(users: int, processes: int, results, wall: float):
+    header = f"{'scenario':<16}{'runs':>7}{'lock':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>9}"
+    print(f"\n=== {users} concurrent user(s) over {processes} process(es), {wall:.1f}s ===")
+    print(header)
+    print("-" * len(header))
+    all_rows = []
+    for name in SCENARIO_WEIGHTS:
+        rows = results.get(name, [])
+        all_rows += rows
+        _print_row(name, rows, wall)
+    _print_row("ALL", all_rows, wall)
+    failures = Counter(r[2] for r in all_rows if r[1] != "ok")
+    for detail, n in failures.most_common(5):
+        print(f"  {n:>5} x {detail}")
+
+
+def _print_row(name: str, rows, wall: float):
+    lat = sorted(r[0] * 1000 for r in rows)
+    locks = sum(1 for r in rows if r[1] == "lock")
+    errors = sum(1 for r in rows if r[1] == "error")
+    print(
+        f"{name:<16}{len(rows):>7}{locks:>7}{errors:>8}"
+        f"{percentile(lat, 50):>10.1f}{percentile(lat, 95):>10.1f}{percentile(lat, 99):>10.1f}"
+        f"{len(rows) / wall if wall else 0:>9.2f}"
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", default="1,5,10,20", help="comma-separated concurrent user counts (default: 1,5,10,20)")
+    ap.add_argument("--processes", type=int, default=1, help="server processes to spread users over (default: 1)")
+    ap.add_argument("--duration", type=float, default=20, help="seconds per user count (default: 20)")
+    ap.add_argument("--patients", type=int, default=500, help="seeded patients (default: 500)")
+    ap.add_argument("--jobs-per-patient", type=int, default=4)
+    ap.add_argument("--notes-per-patient", type=int, default=6)
+    ap.add_argument("--think-time", type=float, default=0.0, help="max random pause between actions, seconds")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--keep-db", action="store_true", help="keep the temporary database after the run")
+    args = ap.parse_args()
+
+    levels = [int(x) for x in args.users.split(",") if x.strip()]
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ent_load_"))
+    db_path = tmp_dir / "load_test.db"
+
+    # Must be set before db is imported so DB_PATH points at the throwaway file
+    # (spawned worker processes inherit it too).
+    os.environ["ENT_DB_PATH"] = str(db_path)
+    os.environ["ENT_WARDS"] = "ENT"  # the ward whose file is DB_PATH
+    _quiet_streamlit()
+
+    try:
+        rng = random.Random(args.seed)
+        patient_ids = seed_database(db_path, args.patients, args.jobs_per_patient, args.notes_per_patient, rng)
+        print(f"Seeded {len(patient_ids)} patients at {db_path}")
+
+        # Warm up imports and the shared connection so the first level isn't penalised.
+        for fn in SCENARIOS.values():
+            fn(random.Random(0), patient_ids)
+
+        for users in levels:
+            results, wall = run_level(users, args.processes, args.duration, patient_ids, args.seed, args.think_time)
+            print_report(users, args.processes, results, wall)
+    finally:
+        if args.keep_db:
+            print(f"\nDatabase kept at {db_path}")
+        else:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
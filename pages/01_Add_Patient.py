@@ -1,20 +1,24 @@
 from datetime import date
 import streamlit as st
 from auth import require_auth, logout_button
-from db import ensure_schema, exec1
+from scheduler import reminders_sidebar
+from db import ensure_schema, exec1, ward_picker
+from duplicates import find_duplicates
 
 # Page setup, auth, schema
 st.set_page_config(page_title="Add Patient • ENT Handover", page_icon="🩺", layout="wide")
 ensure_schema(); require_auth()
 st.sidebar.title("🏥 ENT Handover")
+ward_picker()
 logout_button()
+reminders_sidebar()
 
 st.subheader("➕ Add Patient")
 
 # Keys used by the form widgets (so we can clear them safely)
 ADD_KEYS = [
     "add_name", "add_hosp", "add_nhs", "add_dob",
-    "add_reason", "add_pmh", "add_psh", "add_dh", "add_allergies"
+    "add_reason", "add_pmh", "add_psh", "add_dh", "add_allergies", "add_not_dup"
 ]
 
 def maybe_reset_add_form():
@@ -31,24 +35,50 @@ maybe_reset_add_form()
 if "add_success_msg" in st.session_state:
     st.success(st.session_state.pop("add_success_msg"))
 
-# Build the form (auto-clears UI on submit)
-with st.form("add_patient", clear_on_submit=True):
+# Identity fields sit outside the form so the duplicate check updates as they're typed
+c1, c2 = st.columns(2)
+with c1:
+    name = st.text_input("Patient name*", value="", key="add_name")
+    hosp = st.text_input("Hospital number*", value="", key="add_hosp")
+    nhs = st.text_input("NHS number (optional)", value="", key="add_nhs")
+    # No default DOB: a placeholder date would count as "same DOB" in the duplicate check
+    dob = st.date_input("Date of birth*", value=None, min_value=date(1900, 1, 1), max_value=date.today(), key="add_dob")
+with c2:
+    dups = find_duplicates(name, dob.strftime("%Y-%m-%d") if dob else None, nhs, hosp)
+    # A "not a duplicate" tick only vouches for the matches it was given for
+    dup_ids = tuple(dups["id"])
+    if st.session_state.get("add_dup_ids") != dup_ids:
+        st.session_state.pop("add_not_dup", None)
+        st.session_state["add_dup_ids"] = dup_ids
+    if name.strip() or hosp.strip() or nhs.strip():
+        if dups.empty:
+            st.caption("No similar patients found.")
+        else:
+            st.warning("Possible existing record(s) — check before adding:")
+            st.dataframe(
+                dups.rename(columns={"patient_name":"Patient","hospital_number":"Hosp No","nhs_number":"NHS No",
+                                     "date_of_birth":"DOB","reason_for_admission":"Reason","score":"Match","why":"Why"}),
+                use_container_width=True, hide_index=True,
+                column_config={"Match": st.column_config.ProgressColumn(min_value=0, max_value=1, format="%.2f")},
+            )
+
+# Build the form (cleared via ADD_KEYS after a successful save, kept on errors)
+with st.form("add_patient", clear_on_submit=False):
     c1, c2 = st.columns(2)
     with c1:
-        name = st.text_input("Patient name*", value="", key="add_name")
-        hosp = st.text_input("Hospital number*", value="", key="add_hosp")
-        nhs = st.text_input("NHS number (optional)", value="", key="add_nhs")
-        dob = st.date_input("Date of birth*", value=date(1980, 1, 1), key="add_dob")
-    with c2:
         reason = st.text_input("Reason for admission*", value="", key="add_reason")
+        allergies = st.text_input("Allergies", value="NKDA", key="add_allergies")
         pmh = st.text_area("Past Medical History", value="", key="add_pmh")
+    with c2:
         psh = st.text_area("Past Surgical History", value="", key="add_psh")
         dh = st.text_area("Drug History / meds", value="", key="add_dh")
-        allergies = st.text_input("Allergies", value="NKDA", key="add_allergies")
+    not_dup = st.checkbox("None of the possible records above is this patient", key="add_not_dup") if not dups.empty else True
 
     if st.form_submit_button("Save"):
         if not (name and hosp and reason and dob):
             st.error("Name, Hospital number, Reason, and Date of birth are required.")
+        elif not not_dup:
+            st.error("Possible duplicate: check the matches above, or tick the box to confirm this is a new patient.")
         else:
             try:
                 exec1(
@@ -69,6 +99,7 @@ with st.form("add_patient", clear_on_submit=True):
                         dh.strip(),
                         allergies.strip(),
                     ),
+                    events=(("admission", None, None, reason.strip()),),
                 )
                 # Request a state reset for next render (ensures session_state keys are cleared too)
                 st.session_state["add_success_msg"] = f"Added {name}. Form cleared."
@@ -1,18 +1,22 @@
 from datetime import time
 import streamlit as st
 from auth import require_auth, logout_button
-from db import ensure_schema, q, df, exec1
+from scheduler import reminders_sidebar, scheduler
+from db import ensure_schema, q, df, exec1, job_change_events, ward_picker
+from queries import PATIENT_PICKER, PATIENT_BY_ID, PATIENT_NOTES, PATIENT_JOBS
 from utils import dob_to_age, priority_pill, status_pill
 
 st.set_page_config(page_title="Patient Details • ENT Handover", page_icon="🩺", layout="wide")
 ensure_schema(); require_auth()
 st.sidebar.title("🏥 ENT Handover")
+ward_picker()
 logout_button()
+reminders_sidebar()
 
 st.subheader("🧾 Patient Details")
 
 # ---- Open patient selector at top ----
-all_df = df("SELECT id, patient_name, hospital_number FROM patients ORDER BY created_at DESC")
+all_df = df(PATIENT_PICKER)
 ids_labels = [(int(r["id"]), f'{r["patient_name"]} • {r["hospital_number"]} (ID {int(r["id"])})') for _, r in all_df.iterrows()]
 
 st.markdown("**Open patient:**")
@@ -38,7 +42,7 @@ if not pid and ids_labels:
     pid = st.session_state.selected_patient_id
 
 def _get_patient(pid: int):
-    rows = q("""SELECT id,patient_name,hospital_number,nhs_number,date_of_birth,reason_for_admission,pmh,psh,dh,allergies,created_at,updated_at FROM patients WHERE id=?""",(pid,))
+    rows = q(PATIENT_BY_ID,(pid,))
     return rows[0] if rows else None
 
 p = _get_patient(pid)
@@ -60,23 +64,20 @@ with st.expander("History (PMH / PSH / Drug History)", expanded=False):
 
 st.divider()
 st.markdown("#### 📝 Progress in hospital")
-notes_df = df("SELECT id, note_time, author, note FROM progress_notes WHERE patient_id=? ORDER BY note_time DESC",(pid,))
+notes_df = df(PATIENT_NOTES,(pid,))
 st.dataframe(notes_df, use_container_width=True, hide_index=True)
 with st.form("add_note"):
     ncol = st.columns([4,1])
     note = ncol[0].text_area("Add progress note", placeholder="e.g., ENT reviewed, needle aspiration performed...")
     author = ncol[1].text_input("Author", value="")
     if st.form_submit_button("Add note") and note.strip():
-        exec1("INSERT INTO progress_notes (patient_id,note,author) VALUES (?,?,?)", (pid, note.strip(), author.strip()))
+        exec1("INSERT INTO progress_notes (patient_id,note,author) VALUES (?,?,?)", (pid, note.strip(), author.strip()),
+              events=(("note", pid, None, author.strip() or None),))
         st.success("Note added."); st.rerun()
 
 st.divider()
 st.markdown("#### ✅ Jobs to be done")
-jobs = df("""
-    SELECT id,job_text,priority,status,COALESCE(due_time,'') due_time,COALESCE(assigned_to,'') assigned_to
-    FROM jobs WHERE patient_id=?
-    ORDER BY CASE priority WHEN 'Urgent' THEN 0 WHEN 'Soon' THEN 1 ELSE 2 END, created_at ASC
-""",(pid,))
+jobs = df(PATIENT_JOBS,(pid,))
 if jobs.empty: st.info("No jobs yet.")
 
 for _, row in jobs.iterrows():
@@ -89,7 +90,9 @@ for _, row in jobs.iterrows():
     due        = jb[4].text_input("Due (YYYY-MM-DD HH:MM)", value=row.due_time, key=f"due_{row.id}")
     if jb[5].button("💾", key=f"save_{row.id}"):
         exec1("UPDATE jobs SET status=?, priority=?, assigned_to=?, due_time=?, updated_at=datetime('now') WHERE id=?",
-              (new_status, new_prio, assigned.strip(), due.strip() or None, int(row.id)))
+              (new_status, new_prio, assigned.strip(), due.strip() or None, int(row.id)),
+              events=job_change_events(pid, int(row.id), row.status, new_status, row.priority, new_prio))
+        scheduler().upsert(int(row.id), due.strip() or None, new_status, f"{row.job_text} — {name}")
         st.toast("Job updated")
 
 with st.form("add_job"):
@@ -102,6 +105,8 @@ with st.form("add_job"):
     due_time_val = c4.time_input("Due time", value=time(12,0))
     if st.form_submit_button("Add job") and text.strip():
         due_iso = f"{due_date.strftime('%Y-%m-%d')} {due_time_val.strftime('%H:%M')}" if due_date else None
-        exec1("INSERT INTO jobs (patient_id,job_text,priority,assigned_to,due_time) VALUES (?,?,?,?,?)",
-              (pid, text.strip(), prio, assign_to.strip(), due_iso))
+        job_id = exec1("INSERT INTO jobs (patient_id,job_text,priority,assigned_to,due_time) VALUES (?,?,?,?,?)",
+                       (pid, text.strip(), prio, assign_to.strip(), due_iso),
+                       events=(("job_added", pid, None, text.strip()),))
+        scheduler().upsert(job_id, due_iso, "Open", f"{text.strip()} — {name}")
         st.success("Job added."); st.rerun()
@@ -4,32 +4,22 @@ import pandas as pd
 import streamlit as st
 
 from auth import require_auth, logout_button
-from db import ensure_schema, df, exec1
-from utils import priority_pill, status_pill
+from scheduler import reminders_sidebar, scheduler
+from db import WARDS, current_ward, ensure_schema, df, df_all_wards, exec1, job_change_events, ward_picker
+from queries import JOBS_BOARD
+from utils import priority_pill, status_pill, safe_parse_dt
 
 # ---------------- Page setup, auth, schema ----------------
 st.set_page_config(page_title="Jobs Board • ENT Handover", page_icon="🩺", layout="wide")
 ensure_schema(); require_auth()
 st.sidebar.title("🏥 ENT Handover")
+ward_picker()
 logout_button()
+reminders_sidebar()
 
 st.subheader("🗂️ Jobs Board")
 
 # ---------------- Helpers ----------------
-def safe_parse_dt(s: str | None) -> datetime | None:
-    if not s:
-        return None
-    s = s.strip()
-    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d", "%d/%m/%Y %H:%M", "%d/%m/%Y"):
-        try:
-            return datetime.strptime(s, fmt)
-        except Exception:
-            continue
-    ts = pd.to_datetime(s, errors="coerce")
-    if pd.isna(ts):
-        return None
-    return ts.to_pydatetime()
-
 def label_for_date(d: date | None, today: date) -> str:
     if d is None: return "📅 No due date"
     if d < today: return f"⚠️ Overdue — {d.strftime('%Y-%m-%d (%a)')}"
@@ -45,7 +35,7 @@ def render_job_row(row, key_prefix=""):
         left, mid, right = st.columns([4, 2, 2])
         with left:
             st.markdown(f"**{row.job_text}**")
-            st.caption(f"{row.patient_name} • {row.hospital_number}")
+            st.caption(f"{row.patient_name} • {row.hospital_number}" + (f" • {row.ward}" if all_wards else ""))
         with mid:
             st.markdown(priority_pill(row.priority) + " " + status_pill(row.status), unsafe_allow_html=True)
         with right:
@@ -59,20 +49,28 @@ def render_job_row(row, key_prefix=""):
         # Actions in a single row (list style)
         b1, b2, spacer = st.columns([1, 1, 6])
         if row.status != "In Progress" and b1.button("In progress ⏳", key=f"{key_prefix}start_{row.id}"):
-            exec1("UPDATE jobs SET status='In Progress', updated_at=datetime('now') WHERE id=?", (int(row.id),))
+            exec1("UPDATE jobs SET status='In Progress', updated_at=datetime('now') WHERE id=?", (int(row.id),),
+                  events=job_change_events(int(row.patient_id), int(row.id), row.status, "In Progress", row.priority, row.priority),
+                  ward=row.ward)
+            scheduler(row.ward).upsert(int(row.id), row.due_time, "In Progress", f"{row.job_text} — {row.patient_name}")
             st.rerun()
         if row.status != "Done" and b2.button("Done ✅", key=f"{key_prefix}done_{row.id}"):
-            exec1("UPDATE jobs SET status='Done', updated_at=datetime('now') WHERE id=?", (int(row.id),))
+            exec1("UPDATE jobs SET status='Done', updated_at=datetime('now') WHERE id=?", (int(row.id),),
+                  events=job_change_events(int(row.patient_id), int(row.id), row.status, "Done", row.priority, row.priority),
+                  ward=row.ward)
+            scheduler(row.ward).upsert(int(row.id), row.due_time, "Done", f"{row.job_text} — {row.patient_name}")
             st.rerun()
 
 # ---------------- Load & prepare data ----------------
-jobs = df("""
-    SELECT j.id, j.patient_id, j.job_text, j.priority, j.status,
-           COALESCE(j.due_time, '') AS due_time, COALESCE(j.assigned_to,'') AS assigned_to,
-           p.patient_name, p.hospital_number
-    FROM jobs j
-    JOIN patients p ON p.id = j.patient_id
-""")
+# On-call view: every ward's database queried in parallel and merged.
+all_wards = len(WARDS) > 1 and st.toggle("All wards (on-call)", value=False)
+if all_wards:
+    for w in WARDS:
+        ensure_schema(w)
+    jobs = df_all_wards(JOBS_BOARD)
+else:
+    jobs = df(JOBS_BOARD)
+    jobs.insert(0, "ward", current_ward())
 
 if jobs.empty:
     st.info("No jobs yet. Add jobs from the **Patient Details** page.")
@@ -171,7 +169,7 @@ for d in unique_dates:
     group["status_rank"] = group["status"].map(status_rank)
     group["prio_rank"] = group["priority"].map(prio_rank)
     group["due_sort"] = group["due_dt"].apply(lambda x: x if (x is not None and not pd.isna(x)) else datetime.max)
-    group = group.sort_values(["status_rank", "prio_rank", "due_sort", "id"])
+    group = group.sort_values(["status_rank", "prio_rank", "due_sort", "ward", "id"])
 
     for _, row in group.iterrows():
-        render_job_row(row, key_prefix=f"{str(d) if d else 'none'}_")
+        render_job_row(row, key_prefix=f"{row.ward}_{str(d) if d else 'none'}_")
@@ -0,0 +1,64 @@
+# pages/04_Changes.py
+from datetime import datetime, timedelta, timezone, time
+import streamlit as st
+
+from auth import require_auth, logout_button
+from scheduler import reminders_sidebar
+from db import ensure_schema, df, ward_picker
+from queries import CHANGES_SUMMARY, CHANGES_EVENTS
+
+# ---------------- Page setup, auth, schema ----------------
+st.set_page_config(page_title="Changes • ENT Handover", page_icon="🩺", layout="wide")
+ensure_schema(); require_auth()
+st.sidebar.title("🏥 ENT Handover")
+ward_picker()
+logout_button()
+reminders_sidebar()
+
+st.subheader("🔁 Changes since last handover")
+
+# ---------------- Helpers ----------------
+HANDOVER_HOURS = (8, 20)  # day / night handover times (local)
+
+def last_handover(now: datetime) -> datetime:
+    """Most recent 08:00 or 20:00 before `now`."""
+    candidates = [datetime.combine(now.date() - timedelta(days=d), time(h)) for d in (0, 1) for h in HANDOVER_HOURS]
+    return max(c for c in candidates if c <= now)
+
+def to_utc_str(local_dt: datetime) -> str:
+    """Event timestamps are SQLite datetime('now') strings, i.e. UTC."""
+    return local_dt.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+# ---------------- Cut-off ----------------
+default_since = last_handover(datetime.now())
+c1, c2 = st.columns(2)
+since_date = c1.date_input("Since date", value=default_since.date())
+since_time = c2.time_input("Since time", value=default_since.time())
+since_utc = to_utc_str(datetime.combine(since_date, since_time))
+
+# ---------------- Per-patient summary (range scan on idx_events_ts) ----------------
+summary = df(CHANGES_SUMMARY, (since_utc,))
+
+if summary.empty:
+    st.info("No changes since the selected time.")
+    st.stop()
+
+m1, m2, m3, m4 = st.columns(4)
+m1.metric("New admissions", int(summary["admitted"].sum()))
+m2.metric("New notes", int(summary["notes"].sum()))
+m3.metric("Jobs completed", int(summary["jobs_completed"].sum()))
+m4.metric("Jobs escalated", int(summary["jobs_escalated"].sum()))
+
+summary["admitted"] = summary["admitted"].map(lambda n: "🆕" if n else "")
+st.dataframe(
+    summary.rename(columns={"patient_name":"Patient","hospital_number":"Hosp No","admitted":"New","notes":"Notes",
+                            "jobs_added":"Jobs added","jobs_completed":"Completed","jobs_escalated":"Escalated",
+                            "last_change":"Last change (UTC)"})
+           .drop(columns=["patient_id"]),
+    use_container_width=True, hide_index=True
+)
+
+# ---------------- Event detail ----------------
+with st.expander("All events", expanded=False):
+    events = df(CHANGES_EVENTS, (since_utc,))
+    st.dataframe(events, use_container_width=True, hide_index=True)
@@ -1,11 +1,16 @@
 import streamlit as st
 from auth import require_auth, logout_button
-from db import ensure_schema, conn, df, q
+from scheduler import reminders_sidebar
+from db import ensure_schema, conn, df, q, ward_picker
+from duplicates import find_duplicates, merge_patients
+from queries import ADMIN_COUNT, ADMIN_EXPORT, PATIENT_PICKER, PATIENT_BY_ID
 
 st.set_page_config(page_title="Admin • ENT Handover", page_icon="🩺", layout="wide")
 ensure_schema(); require_auth()
 st.sidebar.title("🏥 ENT Handover")
+ward_picker()
 logout_button()
+reminders_sidebar()
 
 st.subheader("🛠️ Admin")
 
@@ -27,9 +32,9 @@ if not st.session_state.admin_ok:
 
 # ---- Admin content (unchanged except DB path hidden) ----
 counts = {
-    "patients": q("SELECT COUNT(*) FROM patients")[0][0],
-    "progress_notes": q("SELECT COUNT(*) FROM progress_notes")[0][0],
-    "jobs": q("SELECT COUNT(*) FROM jobs")[0][0],
+    "patients": q(ADMIN_COUNT.format(table="patients"))[0][0],
+    "progress_notes": q(ADMIN_COUNT.format(table="progress_notes"))[0][0],
+    "jobs": q(ADMIN_COUNT.format(table="jobs"))[0][0],
 }
 c1, c2, c3 = st.columns(3)
 c1.metric("Patients", counts["patients"])
@@ -43,6 +48,39 @@ if st.button("Flush to disk (checkpoint WAL)"):
 
 st.divider()
 st.markdown("**CSV exports**")
-st.download_button("Patients.csv", df("SELECT * FROM patients").to_csv(index=False).encode(), "patients.csv", "text/csv")
-st.download_button("ProgressNotes.csv", df("SELECT * FROM progress_notes").to_csv(index=False).encode(), "progress_notes.csv", "text/csv")
-st.download_button("Jobs.csv", df("SELECT * FROM jobs").to_csv(index=False).encode(), "jobs.csv", "text/csv")
+st.download_button("Patients.csv", df(ADMIN_EXPORT.format(table="patients")).to_csv(index=False).encode(), "patients.csv", "text/csv")
+st.download_button("ProgressNotes.csv", df(ADMIN_EXPORT.format(table="progress_notes")).to_csv(index=False).encode(), "progress_notes.csv", "text/csv")
+st.download_button("Jobs.csv", df(ADMIN_EXPORT.format(table="jobs")).to_csv(index=False).encode(), "jobs.csv", "text/csv")
+st.download_button("Events.csv", df(ADMIN_EXPORT.format(table="events")).to_csv(index=False).encode(), "events.csv", "text/csv")
+
+st.divider()
+st.markdown("**Merge duplicate patients**")
+# Show success message from the previous merge (if any)
+if "merge_success_msg" in st.session_state:
+    st.success(st.session_state.pop("merge_success_msg"))
+all_df = df(PATIENT_PICKER)
+keep = st.selectbox(
+    "Surviving record",
+    options=[(int(r["id"]), f'{r["patient_name"]} • {r["hospital_number"]} (ID {int(r["id"])})') for _, r in all_df.iterrows()],
+    format_func=lambda x: x[1],
+    key="merge_keep",
+)
+if keep:
+    _, k_name, k_hosp, k_nhs, k_dob, *_ = q(PATIENT_BY_ID, (keep[0],))[0]
+    dups = find_duplicates(k_name, k_dob, k_nhs, k_hosp, exclude_id=keep[0])
+    if dups.empty:
+        st.caption("No likely duplicates for this patient.")
+    else:
+        st.dataframe(dups, use_container_width=True, hide_index=True)
+        drop = st.selectbox(
+            "Merge this record into it (notes and jobs move, record is deleted)",
+            options=[(int(r.id), f"{r.patient_name} • {r.hospital_number} (ID {int(r.id)})") for r in dups.itertuples()],
+            format_func=lambda x: x[1],
+            key="merge_drop",
+        )
+        sure = st.checkbox("I have checked these are the same patient", key="merge_sure")
+        if st.button("Merge patients", disabled=not sure):
+            merge_patients(keep[0], drop[0])
+            st.session_state.pop("merge_sure", None)
+            st.session_state["merge_success_msg"] = f"Merged ID {drop[0]} into ID {keep[0]}."
+            st.rerun()
@@ -0,0 +1,102 @@
+"""
+Read queries issued by the pages, kept in one place so check_query_plans.py
+can EXPLAIN every one of them. Writes are single-row by primary key and stay
+inline in the pages.
+"""
+
+# ---- Home (app.py) ----
+HOME_SORTS = {
+    "Newest first": "created_at DESC",
+    "Patient name (A→Z)": "patient_name ASC",
+    "Hospital number (A→Z)": "hospital_number ASC",
+}
+
+HOME_PATIENTS = """
+    SELECT p.id, p.patient_name, p.hospital_number, COALESCE(p.nhs_number,'') nhs_number,
+           p.date_of_birth, p.reason_for_admission, p.created_at,
+           (SELECT COUNT(*) FROM jobs j WHERE j.patient_id=p.id AND j.status!='Done') AS open_jobs
+    FROM patients p
+    WHERE (p.patient_name LIKE ? OR p.hospital_number LIKE ? OR p.reason_for_admission LIKE ?)
+    ORDER BY {sort_sql}
+    LIMIT ?
+"""
+
+# ---- Patient Details ----
+PATIENT_PICKER = "SELECT id, patient_name, hospital_number FROM patients ORDER BY created_at DESC"
+
+PATIENT_BY_ID = """SELECT id,patient_name,hospital_number,nhs_number,date_of_birth,reason_for_admission,pmh,psh,dh,allergies,created_at,updated_at FROM patients WHERE id=?"""
+
+PATIENT_NOTES = "SELECT id, note_time, author, note FROM progress_notes WHERE patient_id=? ORDER BY note_time DESC"
+
+# ORDER BY matches the expression in idx_jobs_patient_priority exactly; keep them in sync.
+PATIENT_JOBS = """
+    SELECT id,job_text,priority,status,COALESCE(due_time,'') due_time,COALESCE(assigned_to,'') assigned_to
+    FROM jobs WHERE patient_id=?
+    ORDER BY CASE priority WHEN 'Urgent' THEN 0 WHEN 'Soon' THEN 1 ELSE 2 END, created_at ASC
+"""
+
+# ---- Jobs Board ----
+JOBS_BOARD = """
+    SELECT j.id, j.patient_id, j.job_text, j.priority, j.status,
+           COALESCE(j.due_time, '') AS due_time, COALESCE(j.assigned_to,'') AS assigned_to,
+           p.patient_name, p.hospital_number
+    FROM jobs j
+    JOIN patients p ON p.id = j.patient_id
+"""
+
+# ---- Changes since handover ----
+CHANGES_SUMMARY = """
+    SELECT e.patient_id,
+           COALESCE(p.patient_name,'(removed)') AS patient_name, COALESCE(p.hospital_number,'') AS hospital_number,
+           SUM(e.kind='admission') AS admitted,
+           SUM(e.kind='note') AS notes,
+           SUM(e.kind='job_added') AS jobs_added,
+           SUM(e.kind='job_completed') AS jobs_completed,
+           SUM(e.kind='job_escalated') AS jobs_escalated,
+           MAX(e.ts) AS last_change
+    FROM events e
+    LEFT JOIN patients p ON p.id = e.patient_id
+    WHERE e.ts >= ?
+    GROUP BY e.patient_id
+    ORDER BY last_change DESC
+"""
+
+CHANGES_EVENTS = """
+    SELECT e.ts AS "Time (UTC)", COALESCE(p.patient_name,'') AS Patient, e.kind AS Event,
+           COALESCE(e.detail,'') AS Detail
+    FROM events e
+    LEFT JOIN patients p ON p.id = e.patient_id
+    WHERE e.ts >= ?
+    ORDER BY e.ts DESC, e.id DESC
+"""
+
+# ---- Admin (row counts and CSV exports, per table) ----
+ADMIN_TABLES = ["patients", "progress_notes", "jobs", "events"]
+
+ADMIN_COUNT = "SELECT COUNT(*) FROM {table}"
+
+ADMIN_EXPORT = "SELECT * FROM {table}"
+
+# ---- Due-job scheduler (scheduler.py, once per process) ----
+SCHEDULER_OPEN_JOBS = """
+    SELECT j.id, j.due_time, j.status, j.job_text, p.patient_name
+    FROM jobs j JOIN patients p ON p.id = j.patient_id
+    WHERE j.status != 'Done' AND j.due_time IS NOT NULL AND j.due_time != ''
+"""
+
+# ---- Duplicate-patient check (duplicates.py) ----
+# Identifier lookups match the expression indexes idx_patients_hosp_norm / idx_patients_nhs_norm.
+DUP_BY_NAME = "SELECT rowid FROM patients_fts WHERE patients_fts MATCH ? ORDER BY rank LIMIT ?"
+
+# Same-DOB records, so a common name (many equal-ranked trigram hits) still
+# surfaces the one with a matching DOB. Uses idx_patients_dob.
+DUP_BY_DOB = "SELECT id FROM patients WHERE date_of_birth = ? LIMIT ?"
+
+DUP_BY_HOSP = "SELECT id FROM patients WHERE replace(upper(hospital_number),' ','') = ?"
+
+DUP_BY_NHS = "SELECT id FROM patients WHERE replace(nhs_number,' ','') = ?"
+
+DUP_CANDIDATES = """
+    SELECT id, patient_name, hospital_number, COALESCE(nhs_number,'') nhs_number, date_of_birth, reason_for_admission
+    FROM patients WHERE id IN ({placeholders})
+"""
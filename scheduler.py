@@ -0,0 +1,155 @@
+import heapq
+import itertools
+import threading
+from collections import deque
+from contextlib import closing
+from datetime import datetime, timedelta
+import streamlit as st
+
+from db import get_conn, ward_db_path, current_ward
+from queries import SCHEDULER_OPEN_JOBS
+from utils import safe_parse_dt
+
+DUE_SOON = timedelta(minutes=15)
+REFRESH_SECONDS = 30
+MAX_NOTIFICATIONS = 200
+
+class DueScheduler:
+    """Per-process reminder queue for non-Done jobs with a due time.
+
+    A min-heap holds (fire_at, seq, job_id, version, stage) entries, two per job:
+    'soon' at due - 15 min and 'overdue' at due. Job writes and patient merges
+    (which relabel the moved jobs) call upsert(), which bumps the job's version
+    so stale heap entries are skipped when popped. The heap is rebuilt from the
+    live entries once stale ones dominate, so each change costs O(log jobs)
+    amortised rather than growing with the number of edits.
+    A daemon thread sleeps until the next fire time and appends notifications
+    that every session picks up from memory.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._jobs = {}            # job_id -> (version, label, due)
+        self._overdue = set()
+        self._due_soon = set()
+        self._notifications = deque(maxlen=MAX_NOTIFICATIONS)
+        self._notification_no = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    # ---- writes ----
+    def upsert(self, job_id: int, due_time: str | None, status: str, label: str = ""):
+        """Re-schedule one job after an insert/update. Done or undated jobs are dropped.
+
+        If the due time is unchanged the job keeps the stage it has reached, so
+        editing e.g. the assignee of an overdue job doesn't notify again."""
+        due = safe_parse_dt(due_time)
+        with self._cond:
+            version, _, old_due = self._jobs.get(job_id, (0, "", None))
+            version += 1
+            if status == "Done" or due is None or due != old_due:
+                self._overdue.discard(job_id)
+                self._due_soon.discard(job_id)
+            if status == "Done" or due is None:
+                self._jobs.pop(job_id, None)
+            else:
+                self._jobs[job_id] = (version, label, due)
+                if job_id not in self._overdue and job_id not in self._due_soon:
+                    heapq.heappush(self._heap, (due - DUE_SOON, next(self._seq), job_id, version, "soon"))
+                if job_id not in self._overdue:
+                    heapq.heappush(self._heap, (due, next(self._seq), job_id, version, "overdue"))
+            if len(self._heap) > 4 * len(self._jobs):
+                self._compact()
+            self._cond.notify()
+
+    def _compact(self):
+        """Drop heap entries superseded by a later upsert (caller holds the lock)."""
+        self._heap = [e for e in self._heap if self._jobs.get(e[2], (None,))[0] == e[3]]
+        heapq.heapify(self._heap)
+
+    # ---- reads ----
+    def counts(self) -> tuple[int, int]:
+        """(overdue, due within 15 min)."""
+        with self._cond:
+            return len(self._overdue), len(self._due_soon)
+
+    def latest(self) -> int:
+        with self._cond:
+            return self._notification_no
+
+    def notifications_since(self, no: int):
+        """Notifications (no, kind, text) newer than `no`, oldest first."""
+        with self._cond:
+            return [n for n in self._notifications if n[0] > no]
+
+    # ---- background thread ----
+    def load(self, db_path_str: str):
+        """Initial fill from the database; anything already due is applied without notifying."""
+        with closing(get_conn(db_path_str).cursor()) as cur:
+            rows = cur.execute(SCHEDULER_OPEN_JOBS).fetchall()
+        for job_id, due_time, status, job_text, patient_name in rows:
+            self.upsert(job_id, due_time, status, f"{job_text} — {patient_name}")
+        with self._cond:
+            self._fire_due(datetime.now(), notify=False)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="due-scheduler", daemon=True)
+        self._thread.start()
+
+    def _fire_due(self, now: datetime, notify: bool = True):
+        while self._heap and self._heap[0][0] <= now:
+            _, _, job_id, version, stage = heapq.heappop(self._heap)
+            current = self._jobs.get(job_id)
+            if current is None or current[0] != version:
+                continue  # job changed or finished since this entry was pushed
+            _, label, due = current
+            if stage == "soon":
+                if due <= now:
+                    continue  # the 'overdue' entry handles it
+                self._due_soon.add(job_id)
+                text = f"⏰ Due at {due.strftime('%H:%M')}: {label}"
+            else:
+                self._due_soon.discard(job_id)
+                self._overdue.add(job_id)
+                text = f"⚠️ Now overdue: {label}"
+            if notify:
+                self._notification_no += 1
+                self._notifications.append((self._notification_no, stage, text))
+
+    def _run(self):
+        with self._cond:
+            while True:
+                now = datetime.now()
+                self._fire_due(now)
+                timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+                self._cond.wait(timeout)
+
+@st.cache_resource(show_spinner=False)
+def get_scheduler(db_path_str: str):
+    s = DueScheduler()
+    s.load(db_path_str)
+    s.start()
+    return s
+
+def scheduler(ward: str | None = None):
+    """The scheduler for a ward (default: the sidebar selection); one per ward per process."""
+    return get_scheduler(ward_db_path(ward or current_ward()).as_posix())
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def _reminders():
+    s = scheduler()
+    if "reminder_no" not in st.session_state:
+        # Don't replay old reminders to a new session; the badge covers them.
+        st.session_state.reminder_no = s.latest()
+    for no, kind, text in s.notifications_since(st.session_state.reminder_no):
+        st.toast(text)
+        st.session_state.reminder_no = no
+    overdue, soon = s.counts()
+    if overdue or soon:
+        st.markdown(f"⚠️ **{overdue}** overdue &nbsp; ⏰ **{soon}** due soon")
+
+def reminders_sidebar():
+    """Sidebar badge + toasts for due/overdue jobs, refreshed every REFRESH_SECONDS."""
+    with st.sidebar:
+        _reminders()
@@ -6,6 +6,7 @@ Tables:
 - patients
 - progress_notes
 - jobs
+- events
 
 Run: python setup_ent_handover_db.py
 """
@@ -46,6 +47,7 @@ CREATE TABLE IF NOT EXISTS patients (
 CREATE INDEX IF NOT EXISTS idx_patients_hosp_no ON patients(hospital_number);
 CREATE INDEX IF NOT EXISTS idx_patients_nhs_no  ON patients(nhs_number);
 CREATE INDEX IF NOT EXISTS idx_patients_name    ON patients(patient_name);
+CREATE INDEX IF NOT EXISTS idx_patients_created ON patients(created_at);   -- "Newest first" lists
 
 -- Auto-update updated_at on row changes
 CREATE TRIGGER IF NOT EXISTS trg_patients_updated_at
@@ -93,12 +95,65 @@ ON jobs(patient_id, status);
 CREATE INDEX IF NOT EXISTS idx_jobs_due
 ON jobs(due_time);
 
+-- Patient Details job order (Urgent, Soon, Routine, then oldest first)
+CREATE INDEX IF NOT EXISTS idx_jobs_patient_priority
+ON jobs(patient_id, (CASE priority WHEN 'Urgent' THEN 0 WHEN 'Soon' THEN 1 ELSE 2 END), created_at);
+
+-- Open jobs only (partial index) for due-time reminders
+CREATE INDEX IF NOT EXISTS idx_jobs_open_due
+ON jobs(due_time) WHERE status != 'Done';
+
 CREATE TRIGGER IF NOT EXISTS trg_jobs_updated_at
 AFTER UPDATE ON jobs
 FOR EACH ROW
 BEGIN
   UPDATE jobs SET updated_at = datetime('now') WHERE id = NEW.id;
 END;
+
+
+-- =========================
+-- Event log (append-only; written alongside each patient/note/job change)
+-- =========================
+CREATE TABLE IF NOT EXISTS events (
+    id            INTEGER PRIMARY KEY,
+    ts            TEXT    NOT NULL DEFAULT (datetime('now')), -- UTC
+    kind          TEXT    NOT NULL,   -- 'admission', 'note', 'job_added', 'job_status', 'job_completed', 'job_escalated'
+    patient_id    INTEGER NOT NULL,   -- no FK: the log outlives deleted rows
+    ref_id        INTEGER,            -- patient / note / job id the event is about
+    detail        TEXT                -- e.g. "Open → Done", "Routine → Urgent"
+);
+
+CREATE INDEX IF NOT EXISTS idx_events_ts
+ON events(ts);
+
+
+-- =========================
+-- Duplicate-patient check
+-- =========================
+-- Trigram index over patient names (kept in sync by triggers) for fuzzy lookups
+CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+    patient_name, content='patients', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_patients_fts_ins AFTER INSERT ON patients BEGIN
+  INSERT INTO patients_fts(rowid, patient_name) VALUES (new.id, new.patient_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_patients_fts_del AFTER DELETE ON patients BEGIN
+  INSERT INTO patients_fts(patients_fts, rowid, patient_name) VALUES ('delete', old.id, old.patient_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_patients_fts_upd AFTER UPDATE OF patient_name ON patients BEGIN
+  INSERT INTO patients_fts(patients_fts, rowid, patient_name) VALUES ('delete', old.id, old.patient_name);
+  INSERT INTO patients_fts(rowid, patient_name) VALUES (new.id, new.patient_name);
+END;
+
+-- Identifiers compared without spaces (and hospital number case-insensitively)
+CREATE INDEX IF NOT EXISTS idx_patients_hosp_norm ON patients(replace(upper(hospital_number),' ',''));
+CREATE INDEX IF NOT EXISTS idx_patients_nhs_norm  ON patients(replace(nhs_number,' ',''));
+
+-- Same-DOB candidates for the duplicate check
+CREATE INDEX IF NOT EXISTS idx_patients_dob ON patients(date_of_birth);
 """
 
 DEMO_DATA_SQL = r"""
@@ -143,6 +198,8 @@ def create_db(db_path: Path = DB_PATH):
     print(f"Creating/Updating database at: {db_path.resolve()}")
     with sqlite3.connect(db_path) as conn:
         conn.executescript(SCHEMA_SQL)
+        # Index any patients already in the file before the trigram table existed
+        conn.execute("INSERT INTO patients_fts(patients_fts) VALUES ('rebuild')")
         conn.commit()
     print("Schema ensured.")
 
@@ -159,7 +216,7 @@ def main():
 
     print("\nDone ✅")
     print(f"- DB file: {DB_PATH.resolve()}")
-    print("- Tables: patients, progress_notes, jobs")
+    print("- Tables: patients, progress_notes, jobs, events")
     print("- You can connect with any SQLite client or via Python/Streamlit.")
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 from datetime import datetime, date
+import pandas as pd
 
 def dob_to_age(dob_str: str):
     try:
@@ -8,6 +9,20 @@ def dob_to_age(dob_str: str):
     except Exception:
         return None
 
+def safe_parse_dt(s: str | None) -> datetime | None:
+    if not s:
+        return None
+    s = s.strip()
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d", "%d/%m/%Y %H:%M", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(s, fmt)
+        except Exception:
+            continue
+    ts = pd.to_datetime(s, errors="coerce")
+    if pd.isna(ts):
+        return None
+    return ts.to_pydatetime()
+
 def pill(text: str, colour: str) -> str:
     return f"<span class='pill' style='border-color:{colour};color:{colour}'>{text}</span>"
 